@@ -31,6 +31,14 @@ class XLSXOutputArgumentsHelper(interface.ArgumentsHelper):
       argument_group (argparse._ArgumentGroup|argparse.ArgumentParser):
           argparse group.
     """
+    argument_group.add_argument(
+        '--disable_constant_memory', dest='constant_memory',
+        action='store_false', default=True, help=(
+            'Disable the constant memory mode of the XLSX writer. This is '
+            'faster when the spreadsheet fits in memory and stores repeated '
+            'values, such as parser and source, once in a shared strings '
+            'table.'))
+
     argument_group.add_argument(
         '--fields', dest='fields', type=str, action='store',
         default=cls._DEFAULT_FIELDS, help=(
@@ -58,6 +66,8 @@ class XLSXOutputArgumentsHelper(interface.ArgumentsHelper):
       raise errors.BadConfigObject(
           'Output module is not an instance of XLSXOutputModule')
 
+    constant_memory = getattr(options, 'constant_memory', True)
+
     fields = cls._ParseStringOption(
         options, 'fields', default_value=cls._DEFAULT_FIELDS)
 
@@ -70,6 +80,7 @@ class XLSXOutputArgumentsHelper(interface.ArgumentsHelper):
         options, 'timestamp_format',
         default_value=cls._DEFAULT_TIMESTAMP_FORMAT)
 
+    output_module.SetConstantMemory(constant_memory)
     output_module.SetFields([
         field_name.strip() for field_name in fields.split(',')])
     output_module.SetTimestampFormat(timestamp_format)
@@ -40,6 +40,9 @@ class FieldFormattingHelper(object):
 
   _DEFAULT_MESSAGE_FORMATTER = default.DefaultEventFormatter()
 
+  # POSIX epoch without time zone information.
+  _EPOCH = datetime.datetime(1970, 1, 1)
+
   # Maps the name of a field to callback function that formats the field value.
   _FIELD_FORMAT_CALLBACKS = {}
 
@@ -143,7 +146,7 @@ class FieldFormattingHelper(object):
         return '0000-00-00T00:00:00.000000+00:00'
 
       try:
-        datetime_object = datetime.datetime(1970, 1, 1) + datetime.timedelta(
+        datetime_object = self._EPOCH + datetime.timedelta(
             microseconds=timestamp)
 
         datetime_object = datetime_object.astimezone(output_mediator.time_zone)
@@ -564,6 +567,57 @@ class FieldFormattingHelper(object):
             display_name, parser_chain, error_message)
     logger.error(error_message)
 
+  def GetFieldFormatter(self, field_name):
+    """Retrieves a function that formats the specified field.
+
+    The returned function formats the field the same as GetFormattedField, but
+    without having to determine how to format the field on every call.
+
+    Args:
+      field_name (str): name of the field.
+
+    Returns:
+      function: function that formats the field. It takes an output mediator,
+          event, event data, event data stream and event tag as arguments
+          and returns the value of the field or None if not available.
+    """
+    # pylint: disable=unused-argument
+
+    if field_name in self._event_tag_field_names:
+      def _FormatEventTagField(
+          output_mediator, event, event_data, event_data_stream, event_tag):
+        return self._FormatTag(output_mediator, event_tag)
+
+      return _FormatEventTagField
+
+    callback_function = self._callback_functions.get(field_name, None)
+    if not callback_function:
+      if field_name in self._event_data_stream_field_names:
+        def _GetEventDataStreamAttribute(
+            output_mediator, event, event_data, event_data_stream):
+          return getattr(event_data_stream, field_name, None)
+
+        callback_function = _GetEventDataStreamAttribute
+
+      else:
+        def _GetEventDataAttribute(
+            output_mediator, event, event_data, event_data_stream):
+          return getattr(event_data, field_name, None)
+
+        callback_function = _GetEventDataAttribute
+
+    def _FormatField(
+        output_mediator, event, event_data, event_data_stream, event_tag):
+      output_value = callback_function(
+          output_mediator, event, event_data, event_data_stream)
+
+      if output_value is not None and not isinstance(output_value, str):
+        output_value = '{0!s}'.format(output_value)
+
+      return output_value
+
+    return _FormatField
+
   def GetFormattedField(
       self, output_mediator, field_name, event, event_data, event_data_stream,
       event_tag):
@@ -2,10 +2,9 @@
 """Output module for the Excel Spreadsheet (XLSX) output format."""
 
 import datetime
+import itertools
 import os
-import re
 
-import pytz
 import xlsxwriter
 
 from plaso.output import dynamic
@@ -30,27 +29,54 @@ class XLSXOutputModule(interface.OutputModule):
 
   _DEFAULT_TIMESTAMP_FORMAT = 'YYYY-MM-DD HH:MM:SS.000'
 
+  # Names of the fields of which the formatted value only depends on the event
+  # data and event data stream, and can be reused for consecutive events that
+  # share the same event data.
+  _EVENT_DATA_FIELD_NAMES = frozenset([
+      'description', 'description_short', 'display_name', 'filename', 'host',
+      'hostname', 'inode', 'message', 'message_short', 'parser', 'source',
+      'source_long', 'sourcetype', 'user', 'username', 'values'])
+
+  # POSIX epoch without time zone information.
+  _EPOCH = datetime.datetime(1970, 1, 1)
+
   _MAXIMUM_COLUMN_WIDTH = 50
   _MINIMUM_COLUMN_WIDTH = 6
 
-  # Illegal XML string characters.
-  _ILLEGAL_XML_RE = re.compile((
-      r'[\x00-\x08\x0b-\x1f\x7f-\x84\x86-\x9f\ud800-\udfff\ufdd0-\ufddf'
-      r'\ufffe-\uffff]'))
+  # Translation table that maps illegal XML string characters to the Unicode
+  # replacement character (U+FFFD).
+  _ILLEGAL_XML_TRANSLATION_TABLE = {
+      code_point: 0xfffd for code_point in (
+          list(range(0x00, 0x09)) + list(range(0x0b, 0x20)) +
+          list(range(0x7f, 0x85)) + list(range(0x86, 0xa0)) +
+          list(range(0xd800, 0xe000)) + list(range(0xfdd0, 0xfde0)) +
+          [0xfffe, 0xffff])}
+
+  # Illegal XML string characters in the ASCII range.
+  _ILLEGAL_XML_ASCII_CHARACTERS = frozenset(
+      [chr(code_point) for code_point in range(0x00, 0x09)] +
+      [chr(code_point) for code_point in range(0x0b, 0x20)] + ['\x7f'])
 
   def __init__(self):
     """Initializes an output module."""
     super(XLSXOutputModule, self).__init__()
     self._column_widths = []
     self._current_row = 0
+    self._cached_event_data = None
+    self._cached_field_values = {}
+    self._constant_memory = True
     self._custom_fields = {}
+    self._datetime_column_indexes = []
+    self._datetime_column_width = self._MINIMUM_COLUMN_WIDTH
+    self._field_formatters = None
     self._field_formatting_helper = dynamic.DynamicFieldFormattingHelper()
     self._field_names = self._DEFAULT_FIELDS
     self._sheet = None
+    self._string_columns = []
     self._timestamp_format = self._DEFAULT_TIMESTAMP_FORMAT
     self._workbook = None
 
-  def _FormatDateTime(self, output_mediator, event, event_data):  # pylint: disable=missing-return-type-doc
+  def _FormatDateTime(self, output_mediator, event, event_data):  # pylint: disable=missing-return-type-doc,unused-argument
     """Formats the date to a datetime object without timezone information.
 
     Note: timezone information must be removed due to lack of support
@@ -67,12 +93,7 @@ class XLSXOutputModule(interface.OutputModule):
           "ERROR" on OverflowError.
     """
     try:
-      datetime_object = datetime.datetime(
-          1970, 1, 1, 0, 0, 0, 0, tzinfo=pytz.UTC)
-      datetime_object += datetime.timedelta(microseconds=event.timestamp)
-      datetime_object.astimezone(output_mediator.time_zone)
-
-      return datetime_object.replace(tzinfo=None)
+      return self._EPOCH + datetime.timedelta(microseconds=event.timestamp)
 
     except (OSError, OverflowError, TypeError, ValueError) as exception:
       self._ReportEventError(event, event_data, (
@@ -93,12 +114,27 @@ class XLSXOutputModule(interface.OutputModule):
     Returns:
       str: sanitized value of the field.
     """
-    return self._ILLEGAL_XML_RE.sub('\ufffd', field)
+    # Most field values consist of printable ASCII characters only, which can
+    # be checked without creating a new string.
+    if field.isascii() and (
+        field.isprintable() or
+        self._ILLEGAL_XML_ASCII_CHARACTERS.isdisjoint(field)):
+      return field
+
+    # Note that the field is sanitized as a string rather than after encoding it
+    # as UTF-8, since xlsxwriter only accepts strings and lone surrogates, that
+    # are illegal XML string characters, cannot be encoded as UTF-8.
+    return field.translate(self._ILLEGAL_XML_TRANSLATION_TABLE)
 
   def Close(self):
     """Closes the workbook."""
-    for column_index, column_width in enumerate(self._column_widths):
-      self._sheet.set_column(column_index, column_index, column_width)
+    # Set the width of adjacent columns with the same width in a single call.
+    first_column_index = 0
+    for column_width, columns in itertools.groupby(self._column_widths):
+      last_column_index = first_column_index + len(list(columns)) - 1
+      self._sheet.set_column(
+          first_column_index, last_column_index, column_width)
+      first_column_index = last_column_index + 1
 
     self._workbook.close()
     self._workbook = None
@@ -118,24 +154,52 @@ class XLSXOutputModule(interface.OutputModule):
     Returns:
       dict[str, str]: output field values per name.
     """
+    if event_data is not self._cached_event_data:
+      self._cached_field_values = {}
+      self._cached_event_data = event_data
+
+    if self._field_formatters is None:
+      self._field_formatters = []
+      for field_name in self._field_names:
+        # The datetime field is formatted by the output module itself.
+        field_formatter = None
+        if field_name != 'datetime':
+          field_formatter = self._field_formatting_helper.GetFieldFormatter(
+              field_name)
+
+        self._field_formatters.append((field_name, field_formatter))
+
+    # Bind frequently used attributes and methods to local variables to reduce
+    # the number of lookups per field.
+    cached_field_values = self._cached_field_values
+    custom_fields = self._custom_fields
+    sanitize_field = self._SanitizeField
+
     field_values = {}
-    for field_name in self._field_names:
-      if field_name == 'datetime':
+    for field_name, field_formatter in self._field_formatters:
+      if not field_formatter:
         field_values['datetime'] = self._FormatDateTime(
             output_mediator, event, event_data)
         continue
 
-      field_value = self._field_formatting_helper.GetFormattedField(
-          output_mediator, field_name, event, event_data, event_data_stream,
-          event_tag)
+      field_value = cached_field_values.get(field_name, None)
+      if field_value is not None:
+        field_values[field_name] = field_value
+        continue
 
-      if field_value is None and field_name in self._custom_fields:
-        field_value = self._custom_fields.get(field_name, None)
+      field_value = field_formatter(
+          output_mediator, event, event_data, event_data_stream, event_tag)
+
+      if field_value is None and field_name in custom_fields:
+        field_value = custom_fields.get(field_name, None)
 
       if field_value is None:
         field_value = '-'
       else:
-        field_value = self._SanitizeField(field_value)
+        field_value = sanitize_field(field_value)
+
+      if field_name in self._EVENT_DATA_FIELD_NAMES:
+        cached_field_values[field_name] = field_value
 
       field_values[field_name] = field_value
 
@@ -161,9 +225,10 @@ class XLSXOutputModule(interface.OutputModule):
           '[{0:s}]').format(path))
 
     options = {
-        'constant_memory': True,
-        'strings_to_urls': False,
+        'constant_memory': self._constant_memory,
         'strings_to_formulas': False,
+        'strings_to_numbers': False,
+        'strings_to_urls': False,
         'default_date_format': self._timestamp_format}
     self._workbook = xlsxwriter.Workbook(path, options)
     self._sheet = self._workbook.add_worksheet('Sheet')
@@ -176,6 +241,21 @@ class XLSXOutputModule(interface.OutputModule):
       field_names (list[str]): names of additional fields to output.
     """
     self._field_names.extend(field_names)
+    self._field_formatters = None
+
+  def SetConstantMemory(self, constant_memory):
+    """Sets if the constant memory mode of the XLSX writer should be used.
+
+    In constant memory mode every row is written to disk as soon as the next
+    row is written. Without constant memory mode the workbook is kept in memory
+    until it is closed, which is faster and stores repeated string values once
+    in a shared strings table, but requires memory proportional to the size
+    of the spreadsheet.
+
+    Args:
+      constant_memory (bool): True if the constant memory mode should be used.
+    """
+    self._constant_memory = constant_memory
 
   def SetCustomFields(self, field_names_and_values):
     """Sets the names and values of custom fields to output.
@@ -186,6 +266,7 @@ class XLSXOutputModule(interface.OutputModule):
     """
     self._custom_fields = dict(field_names_and_values)
     self._field_names.extend(self._custom_fields.keys())
+    self._field_formatters = None
 
   def SetFields(self, field_names):
     """Sets the names of the fields to output.
@@ -194,6 +275,7 @@ class XLSXOutputModule(interface.OutputModule):
       field_names (list[str]): names of the fields to output.
     """
     self._field_names = field_names
+    self._field_formatters = None
 
   def SetTimestampFormat(self, timestamp_format):
     """Set the timestamp format to use for the datetime column.
@@ -211,23 +293,45 @@ class XLSXOutputModule(interface.OutputModule):
           modules and other components, such as storage and dfVFS.
       field_values (dict[str, str]): output field values per name.
     """
-    for column_index, field_name in enumerate(self._field_names):
+    # Bind frequently used attributes to local variables to reduce the number
+    # of lookups per field.
+    column_widths = self._column_widths
+    current_row = self._current_row
+    datetime_column_width = self._datetime_column_width
+    maximum_column_width = self._MAXIMUM_COLUMN_WIDTH
+
+    # The type of the field values is known, hence write_datetime() and
+    # write_string() are used instead of write(), which determines the type
+    # of every value.
+    write_datetime = self._sheet.write_datetime
+    write_string = self._sheet.write_string
+
+    for column_index, field_name in self._string_columns:
       field_value = field_values.get(field_name, None)
-      if field_name == 'datetime' and field_value:
-        self._sheet.write_datetime(self._current_row, column_index, field_value)
-        column_width = len(self._timestamp_format) + 2
-      else:
-        field_value = field_value or ''
+      if not field_value:
+        continue
 
-        self._sheet.write(self._current_row, column_index, field_value)
-        column_width = len(field_value) + 2
+      write_string(current_row, column_index, field_value)
 
       # Auto adjust the column width based on the length of the output value.
-      column_width = min(column_width, self._MAXIMUM_COLUMN_WIDTH)
-      column_width = max(column_width, self._MINIMUM_COLUMN_WIDTH,
-                         self._column_widths[column_index])
+      column_width = min(len(field_value) + 2, maximum_column_width)
+
+      if column_width > column_widths[column_index]:
+        column_widths[column_index] = column_width
 
-      self._column_widths[column_index] = column_width
+    if self._datetime_column_indexes:
+      field_value = field_values.get('datetime', None)
+      for column_index in self._datetime_column_indexes:
+        if isinstance(field_value, datetime.datetime):
+          write_datetime(current_row, column_index, field_value)
+
+          if datetime_column_width > column_widths[column_index]:
+            column_widths[column_index] = datetime_column_width
+
+        elif field_value:
+          # The field value is "ERROR" if the date and time value could not be
+          # formatted.
+          write_string(current_row, column_index, field_value)
 
     self._current_row += 1
 
@@ -242,12 +346,25 @@ class XLSXOutputModule(interface.OutputModule):
     cell_format.set_align('center')
 
     self._column_widths = []
+    self._datetime_column_indexes = []
+    self._string_columns = []
     for column_index, field_name in enumerate(self._field_names):
       self._sheet.write(0, column_index, field_name, cell_format)
 
-      column_width = len(field_name) + 2
+      # Determine the layout of the columns once, so that the field name does
+      # not need to be compared for every row.
+      if field_name == 'datetime':
+        self._datetime_column_indexes.append(column_index)
+      else:
+        self._string_columns.append((column_index, field_name))
+
+      column_width = max(len(field_name) + 2, self._MINIMUM_COLUMN_WIDTH)
       self._column_widths.append(column_width)
 
+    # The width of the datetime column only depends on the timestamp format.
+    self._datetime_column_width = min(
+        len(self._timestamp_format) + 2, self._MAXIMUM_COLUMN_WIDTH)
+
     self._current_row = 1
     self._sheet.autofilter(0, len(self._field_names) - 1, 0, 0)
     self._sheet.freeze_panes(1, 0)
@@ -49,40 +49,56 @@ class APTHistoryLogTextPlugin(interface.TextPlugin):
 
   ENCODING = 'utf-8'
 
+  _END_OF_LINE = pyparsing.Suppress(pyparsing.LineEnd())
+
+  # Every line kind is matched with a single regular expression instead of
+  # a chain of pyparsing elements, which reduces the per-line overhead.
+
   # Date and time values are formatted as:
   # 2019-07-10  16:38:12
-  _DATE_TIME = pyparsing.Regex(
-      r'(?P<date_time>[0-9]{4}-[0-9]{2}-[0-9]{2}  '
-      r'[0-9]{2}:[0-9]{2}:[0-9]{2})')
+  _DATE_TIME_PATTERN = (
+      r'(?P<year>[0-9]{4})-(?P<month>[0-9]{2})-(?P<day_of_month>[0-9]{2})  '
+      r'(?P<hours>[0-9]{2}):(?P<minutes>[0-9]{2}):(?P<seconds>[0-9]{2})')
 
-  _END_OF_LINE = pyparsing.Suppress(pyparsing.LineEnd())
+  _TIME_ELEMENTS_NAMES = (
+      'year', 'month', 'day_of_month', 'hours', 'minutes', 'seconds')
 
   # Start-Date: 2019-07-10  16:38:12
-  _RECORD_START_LINE = (
-      pyparsing.Literal('Start-Date:') + _DATE_TIME + _END_OF_LINE)
-
-  _RECORD_BODY_LINE = (
-      pyparsing.one_of([
-          'Commandline:',
-          'Downgrade:',
-          'Error:',
-          'Install:',
-          'Purge:',
-          'Remove:',
-          'Requested-By:',
-          'Upgrade:']) +
-      pyparsing.restOfLine() +
-      _END_OF_LINE)
+  _RECORD_START_LINE = pyparsing.Regex(
+      r'Start-Date: *' + _DATE_TIME_PATTERN) + _END_OF_LINE
+
+  # Event data attribute name and package command per record body command.
+  _RECORD_BODY_ATTRIBUTES = {
+      'Commandline': ('command_line', None),
+      'Downgrade': ('packages', 'Downgrade'),
+      'Error': ('error', None),
+      'Install': ('packages', 'Install'),
+      'Purge': ('packages', 'Purge'),
+      'Remove': ('packages', 'Remove'),
+      'Requested-By': ('requester', None),
+      'Upgrade': ('packages', 'Upgrade')}
+
+  # Note that the body excludes leading and trailing whitespace, where
+  # [^\S\n] matches whitespace other than the end of the line.
+  _RECORD_BODY_LINE = pyparsing.Regex(
+      r'(?P<command>Commandline|Downgrade|Error|Install|Purge|Remove|'
+      r'Requested-By|Upgrade):'
+      r'[^\S\n]*(?P<body>(?:.*\S)?)[^\S\n]*') + _END_OF_LINE
 
   # End-Date: 2019-07-10  16:38:10
-  _RECORD_END_LINE = (
-      pyparsing.Literal('End-Date:') + _DATE_TIME + _END_OF_LINE)
+  _RECORD_END_LINE = pyparsing.Regex(
+      r'End-Date: *' + _DATE_TIME_PATTERN) + _END_OF_LINE
 
   _LINE_STRUCTURES = [
       ('record_start', _RECORD_START_LINE),
       ('record_body', _RECORD_BODY_LINE),
       ('record_end', _RECORD_END_LINE)]
 
+  # Prefixes of the lines that can be matched by the line structures.
+  _LINE_PREFIXES = (
+      'Commandline:', 'Downgrade:', 'End-Date:', 'Error:', 'Install:',
+      'Purge:', 'Remove:', 'Requested-By:', 'Start-Date:', 'Upgrade:')
+
   # APT History logs can start with empty lines.
   VERIFICATION_GRAMMAR = pyparsing.ZeroOrMore(_END_OF_LINE) + _RECORD_START_LINE
 
@@ -124,23 +140,24 @@ class APTHistoryLogTextPlugin(interface.TextPlugin):
           a log entry.
 
     Raises:
-      ParseError: when the date and time value is missing.
+      ParseError: when the body line is not preceded by a start line or
+          the command is not supported.
     """
-    command, body = structure
+    if not self._event_data:
+      raise errors.ParseError('Missing start of record.')
 
-    if command == 'Commandline:':
-      self._event_data.command_line = body.strip()
+    command = self._GetValueFromStructure(structure, 'command')
+    body = self._GetValueFromStructure(structure, 'body', default_value='')
 
-    elif command == 'Error:':
-      self._event_data.error = body.strip()
+    try:
+      attribute_name, package_command = self._RECORD_BODY_ATTRIBUTES[command]
+    except KeyError:
+      raise errors.ParseError(f'Unsupported command: {command!s}')
 
-    elif command == 'Requested-By:':
-      self._event_data.requester = body.strip()
+    setattr(self._event_data, attribute_name, body)
 
-    elif command in (
-        'Downgrade:', 'Install:', 'Purge:', 'Remove:', 'Upgrade:'):
-      self._event_data.command = command[:-1]
-      self._event_data.packages = body.strip()
+    if package_command:
+      self._event_data.command = package_command
 
   def _ParseRecordEnd(self, parser_mediator, structure):
     """Parses the last line of a log record.
@@ -150,11 +167,15 @@ class APTHistoryLogTextPlugin(interface.TextPlugin):
           and other components, such as storage and dfVFS.
       structure (pyparsing.ParseResults): structure of tokens derived from
           a log entry.
+
+    Raises:
+      ParseError: when the end line is not preceded by a start line or
+          the date and time value cannot be parsed.
     """
-    time_elements_structure = self._GetValueFromStructure(
-        structure, 'date_time')
+    if not self._event_data:
+      raise errors.ParseError('Missing start of record.')
 
-    self._event_data.end_time = self._ParseTimeElements(time_elements_structure)
+    self._event_data.end_time = self._ParseTimeElements(structure)
 
     parser_mediator.ProduceEventData(self._event_data)
 
@@ -167,13 +188,12 @@ class APTHistoryLogTextPlugin(interface.TextPlugin):
       structure (pyparsing.ParseResults): structure of tokens derived from
           a log entry.
     """
+    # Note that a new event data instance is needed per record since
+    # the attribute container store can retain a reference to the produced
+    # event data and sets its identifier.
     self._event_data = APTHistoryLogEventData()
 
-    time_elements_structure = self._GetValueFromStructure(
-        structure, 'date_time')
-
-    self._event_data.start_time = self._ParseTimeElements(
-        time_elements_structure)
+    self._event_data.start_time = self._ParseTimeElements(structure)
 
   def _ParseTimeElements(self, time_elements_structure):
     """Parses date and time elements of a log line.
@@ -190,24 +210,51 @@ class APTHistoryLogTextPlugin(interface.TextPlugin):
           the time elements.
     """
     try:
-      time_elements_structure = time_elements_structure.replace('  ', ' ')
+      time_elements_tuple = tuple(
+          int(time_elements_structure[name], 10)
+          for name in self._TIME_ELEMENTS_NAMES)
 
-      date_time = dfdatetime_time_elements.TimeElements()
-      date_time.CopyFromDateTimeString(time_elements_structure)
+      date_time = dfdatetime_time_elements.TimeElements(
+          time_elements_tuple=time_elements_tuple)
 
       # APT History logs store date and time values in local time.
       date_time.is_local_time = True
 
-      # TODO: remove this after updating dfDateTime not to set the time zone in
-      # CopyFromDateTimeString for a time string without time zone information.
-      date_time.time_zone_offset = None
-
       return date_time
 
-    except (TypeError, ValueError) as exception:
+    except (KeyError, TypeError, ValueError) as exception:
       raise errors.ParseError(
           f'Unable to parse time elements with error: {exception!s}')
 
+  def _ParseString(self, string):
+    """Parses a string for known grammar.
+
+    Args:
+      string (str): string.
+
+    Returns:
+      tuple[str, pyparsing.ParseResults, int, int]: key, parsed tokens, start
+          and end offset.
+
+    Raises:
+      ParseError: when the string cannot be parsed by the grammar.
+    """
+    # Fail fast on lines that cannot be matched by the line structures, since
+    # pyparsing otherwise scans the remainder of the string for a match. Note
+    # that a match can be preceded by other text on the same line, such as
+    # whitespace, hence the prefixes are searched for in the entire line.
+    if not string.startswith(self._LINE_PREFIXES):
+      end_of_line = string.find('\n')
+      if end_of_line >= 0:
+        line = string[:end_of_line]
+      else:
+        line = string
+
+      if not any(prefix in line for prefix in self._LINE_PREFIXES):
+        raise errors.ParseError('No match found.')
+
+    return super(APTHistoryLogTextPlugin, self)._ParseString(string)
+
   def _ResetState(self):
     """Resets stored values."""
     self._event_data = None
@@ -233,11 +280,8 @@ class APTHistoryLogTextPlugin(interface.TextPlugin):
     except errors.ParseError:
       return False
 
-    time_elements_structure = self._GetValueFromStructure(
-        structure, 'date_time')
-
     try:
-      self._ParseTimeElements(time_elements_structure)
+      self._ParseTimeElements(structure)
     except errors.ParseError:
       return False
 
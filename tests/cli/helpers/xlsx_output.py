@@ -19,11 +19,17 @@ class XLSXOutputArgumentsHelperTest(test_lib.OutputModuleArgumentsHelperTest):
   # pylint: disable=no-member,protected-access
 
   _EXPECTED_OUTPUT = """\
-usage: cli_helper.py [--fields FIELDS] [--timestamp_format TIMESTAMP_FORMAT]
+usage: cli_helper.py [--disable_constant_memory] [--fields FIELDS]
+                     [--timestamp_format TIMESTAMP_FORMAT]
 
 Test argument parser.
 
 {0:s}:
+  --disable_constant_memory
+                        Disable the constant memory mode of the XLSX writer.
+                        This is faster when the spreadsheet fits in memory and
+                        stores repeated values, such as parser and source,
+                        once in a shared strings table.
   --fields FIELDS       Defines which fields should be included in the output.
   --timestamp_format TIMESTAMP_FORMAT
                         Set the timestamp format that will be used in the
@@ -54,6 +60,12 @@ Test argument parser.
     options.write = 'plaso.xlsx'
     xlsx_output.XLSXOutputArgumentsHelper.ParseOptions(
         options, output_module)
+    self.assertTrue(output_module._constant_memory)
+
+    options.constant_memory = False
+    xlsx_output.XLSXOutputArgumentsHelper.ParseOptions(
+        options, output_module)
+    self.assertFalse(output_module._constant_memory)
 
     with self.assertRaises(errors.BadConfigObject):
       xlsx_output.XLSXOutputArgumentsHelper.ParseOptions(
@@ -21,7 +21,9 @@ from tests.output import test_lib
 class TestFieldFormattingHelper(formatting_helper.FieldFormattingHelper):
   """Field formatter helper for testing purposes."""
 
-  _FIELD_FORMAT_CALLBACKS = {'zone': '_FormatTimeZone'}
+  _FIELD_FORMAT_CALLBACKS = {
+      'tag': '_FormatTag',
+      'zone': '_FormatTimeZone'}
 
 
 class FieldFormattingHelperTest(test_lib.OutputModuleTestCase):
@@ -459,6 +461,52 @@ class FieldFormattingHelperTest(test_lib.OutputModuleTestCase):
 
   # TODO: add coverage for _ReportEventError
 
+  def testGetFieldFormatter(self):
+    """Tests the GetFieldFormatter function."""
+    output_mediator = self._CreateOutputMediator()
+    test_helper = TestFieldFormattingHelper()
+
+    event, event_data, event_data_stream = (
+        containers_test_lib.CreateEventFromValues(self._TEST_EVENTS[0]))
+
+    field_formatter = test_helper.GetFieldFormatter('zone')
+    zone_string = field_formatter(
+        output_mediator, event, event_data, event_data_stream, None)
+    self.assertEqual(zone_string, 'UTC')
+
+    field_formatter = test_helper.GetFieldFormatter('hostname')
+    hostname = field_formatter(
+        output_mediator, event, event_data, event_data_stream, None)
+    self.assertEqual(hostname, 'ubuntu')
+
+    field_formatter = test_helper.GetFieldFormatter('path_spec')
+    path_spec_string = field_formatter(
+        output_mediator, event, event_data, event_data_stream, None)
+    self.assertIsNotNone(path_spec_string)
+
+    expected_path_spec_string = test_helper.GetFormattedField(
+        output_mediator, 'path_spec', event, event_data, event_data_stream,
+        None)
+    self.assertEqual(path_spec_string, expected_path_spec_string)
+
+    event_tag = events.EventTag()
+    event_tag.AddLabels(['Malware', 'Printed'])
+
+    field_formatter = test_helper.GetFieldFormatter('tag')
+    for test_event_tag in (None, event_tag):
+      tag_string = field_formatter(
+          output_mediator, event, event_data, event_data_stream,
+          test_event_tag)
+
+      expected_tag_string = test_helper.GetFormattedField(
+          output_mediator, 'tag', event, event_data, event_data_stream,
+          test_event_tag)
+      self.assertEqual(tag_string, expected_tag_string)
+
+    tag_string = field_formatter(
+        output_mediator, event, event_data, event_data_stream, event_tag)
+    self.assertEqual(tag_string, 'Malware Printed')
+
   def testGetFormattedField(self):
     """Tests the GetFormattedField function."""
     output_mediator = self._CreateOutputMediator()
@@ -26,6 +26,7 @@ class XLSXOutputModuleTest(test_lib.OutputModuleTestCase):
   _SHARED_STRINGS = 'xl/sharedStrings.xml'
   _SHEET1 = 'xl/worksheets/sheet1.xml'
 
+  _COLUMN_INFORMATION_TAG = '}col'
   _COLUMN_TAG = '}c'
   _ROW_TAG = '}row'
   _SHARED_STRING_TAG = '}t'
@@ -43,6 +44,36 @@ class XLSXOutputModuleTest(test_lib.OutputModuleTestCase):
        'timestamp': '2012-06-27 18:17:01',
        'timestamp_desc': definitions.TIME_DESCRIPTION_METADATA_MODIFICATION}]
 
+  def _GetSheetColumns(self, filename):
+    """Parses the column information of the first sheet of an XLSX document.
+
+    Args:
+      filename (str): The file path of the XLSX document to parse.
+
+    Returns:
+      list[tuple[int, int, float]]: first column, last column and width of
+          every column information record of the first sheet.
+
+    Raises:
+      ValueError: if the sheet cannot be found.
+    """
+    columns = []
+    with zipfile.ZipFile(filename) as zip_file:
+      if self._SHEET1 not in zip_file.namelist():
+        # Fail if we cannot find the expected first sheet.
+        raise ValueError('Unable to locate expected sheet: {0:s}'.format(
+            self._SHEET1))
+
+      with zip_file.open(self._SHEET1) as zip_file_object:
+        for _, element in ElementTree.iterparse(zip_file_object):
+          if element.tag.endswith(self._COLUMN_INFORMATION_TAG):
+            columns.append((
+                int(element.attrib['min'], 10),
+                int(element.attrib['max'], 10),
+                float(element.attrib['width'])))
+
+    return columns
+
   def _GetSheetRows(self, filename):
     """Parses the contents of the first sheet of an XLSX document.
 
@@ -131,6 +162,81 @@ class XLSXOutputModuleTest(test_lib.OutputModuleTestCase):
 
     self.assertEqual(field_values, expected_field_values)
 
+  def testGetFieldValuesWithSharedEventData(self):
+    """Tests the GetFieldValues function with events that share event data."""
+    output_mediator = self._CreateOutputMediator()
+
+    formatters_directory_path = self._GetTestFilePath(['formatters'])
+    output_mediator.ReadMessageFormattersFromDirectory(
+        formatters_directory_path)
+
+    output_module = xlsx.XLSXOutputModule()
+
+    event, event_data, event_data_stream = (
+        containers_test_lib.CreateEventFromValues(self._TEST_EVENTS[0]))
+
+    first_field_values = output_module.GetFieldValues(
+        output_mediator, event, event_data, event_data_stream, None)
+
+    # Use a different event and event tag with the same event data.
+    event_values = dict(self._TEST_EVENTS[0])
+    event_values['timestamp'] = '2012-06-27 18:17:02'
+    event_values['timestamp_desc'] = definitions.TIME_DESCRIPTION_LAST_ACCESS
+
+    event, _, _ = containers_test_lib.CreateEventFromValues(event_values)
+
+    event_tag = events.EventTag()
+    event_tag.AddLabels(['Malware'])
+
+    second_field_values = output_module.GetFieldValues(
+        output_mediator, event, event_data, event_data_stream, event_tag)
+
+    self.assertEqual(
+        first_field_values['datetime'],
+        datetime.datetime(2012, 6, 27, 18, 17, 1))
+    self.assertEqual(
+        second_field_values['datetime'],
+        datetime.datetime(2012, 6, 27, 18, 17, 2))
+
+    self.assertEqual(
+        first_field_values['timestamp_desc'], 'Metadata Modification Time')
+    self.assertEqual(second_field_values['timestamp_desc'], 'Last Access Time')
+
+    self.assertEqual(first_field_values['tag'], '-')
+    self.assertEqual(second_field_values['tag'], 'Malware')
+
+    # Values that only depend on the event data are reused.
+    for field_name in (
+        'display_name', 'message', 'parser', 'source', 'source_long'):
+      self.assertIs(
+          second_field_values[field_name], first_field_values[field_name])
+
+    # Values are not reused for events with different event data.
+    event_values = dict(self._TEST_EVENTS[0])
+    event_values['text'] = 'Other text'
+
+    event, event_data, event_data_stream = (
+        containers_test_lib.CreateEventFromValues(event_values))
+
+    third_field_values = output_module.GetFieldValues(
+        output_mediator, event, event_data, event_data_stream, None)
+
+    self.assertEqual(third_field_values['message'], 'Other text')
+    self.assertEqual(third_field_values['source'], 'FILE')
+
+  def testSanitizeField(self):
+    """Tests the _SanitizeField function."""
+    output_module = xlsx.XLSXOutputModule()
+
+    sanitized_field = output_module._SanitizeField('tab\tnew line\ntext')
+    self.assertEqual(sanitized_field, 'tab\tnew line\ntext')
+
+    sanitized_field = output_module._SanitizeField(
+        'bell\x07 escape\x1b delete\x7f next line\x85 surrogate\ud800')
+    self.assertEqual(sanitized_field, (
+        'bell\ufffd escape\ufffd delete\ufffd next line\x85 '
+        'surrogate\ufffd'))
+
   def testWriteFieldValues(self):
     """Tests the WriteFieldValues function."""
     output_mediator = self._CreateOutputMediator()
@@ -182,6 +288,152 @@ class XLSXOutputModuleTest(test_lib.OutputModuleTestCase):
       self.assertEqual(len(expected_event_body), len(rows[1]))
       self.assertEqual(expected_event_body, rows[1])
 
+  def testWriteFieldValuesColumnWidths(self):
+    """Tests the column widths written by WriteFieldValues and Close."""
+    output_mediator = self._CreateOutputMediator()
+
+    formatters_directory_path = self._GetTestFilePath(['formatters'])
+    output_mediator.ReadMessageFormattersFromDirectory(
+        formatters_directory_path)
+
+    output_module = xlsx.XLSXOutputModule()
+    output_module.SetFields(['datetime', 'parser', 'source', 'message'])
+
+    with shared_test_lib.TempDirectory() as temp_directory:
+      xslx_file = os.path.join(temp_directory, 'xlsx.out')
+
+      event, event_data, event_data_stream = (
+          containers_test_lib.CreateEventFromValues(self._TEST_EVENTS[0]))
+
+      output_module.Open(path=xslx_file)
+
+      try:
+        output_module.WriteHeader(output_mediator)
+
+        field_values = output_module.GetFieldValues(
+            output_mediator, event, event_data, event_data_stream, None)
+
+        output_module.WriteFieldValues(output_mediator, field_values)
+
+      finally:
+        output_module.Close()
+
+      try:
+        columns = self._GetSheetColumns(xslx_file)
+      except ValueError as exception:
+        self.fail(exception)
+
+    # Note that xlsxwriter adds padding to the width of a column.
+    columns = [
+        (first_column, last_column, int(width))
+        for first_column, last_column, width in columns]
+
+    # The parser and source columns both have a width of 8 and are written as
+    # a single range.
+    self.assertEqual(columns, [(1, 1, 25), (2, 3, 8), (4, 4, 50)])
+
+    column_widths = []
+    for first_column, last_column, width in columns:
+      column_widths.extend([width] * (last_column - first_column + 1))
+
+    self.assertEqual(column_widths, output_module._column_widths)
+
+  def testWriteFieldValuesWithOutOfRangeTimestamp(self):
+    """Tests the WriteFieldValues function with an out of range timestamp."""
+    output_mediator = self._CreateOutputMediator()
+
+    formatters_directory_path = self._GetTestFilePath(['formatters'])
+    output_mediator.ReadMessageFormattersFromDirectory(
+        formatters_directory_path)
+
+    output_module = xlsx.XLSXOutputModule()
+
+    with shared_test_lib.TempDirectory() as temp_directory:
+      xslx_file = os.path.join(temp_directory, 'xlsx.out')
+
+      event_values = dict(self._TEST_EVENTS[0])
+      event_values['timestamp'] = 2**62
+
+      event, event_data, event_data_stream = (
+          containers_test_lib.CreateEventFromValues(event_values))
+
+      output_module.Open(path=xslx_file)
+
+      try:
+        output_module.WriteHeader(output_mediator)
+
+        field_values = output_module.GetFieldValues(
+            output_mediator, event, event_data, event_data_stream, None)
+        self.assertEqual(field_values['datetime'], 'ERROR')
+
+        output_module.WriteFieldValues(output_mediator, field_values)
+
+      finally:
+        output_module.Close()
+
+      try:
+        rows = self._GetSheetRows(xslx_file)
+      except ValueError as exception:
+        self.fail(exception)
+
+      expected_event_body = [
+          'ERROR', 'Metadata Modification Time', 'FILE', 'Test log file',
+          'Reporter <CRON> PID: 8442 (pam_unix(cron:session): session '
+          'closed for user root)',
+          '-', '-', '-']
+
+      self.assertEqual(expected_event_body, rows[1])
+
+  def testWriteFieldValuesWithRepeatedDatetimeField(self):
+    """Tests the WriteFieldValues function with a repeated datetime field."""
+    output_mediator = self._CreateOutputMediator()
+
+    formatters_directory_path = self._GetTestFilePath(['formatters'])
+    output_mediator.ReadMessageFormattersFromDirectory(
+        formatters_directory_path)
+
+    output_module = xlsx.XLSXOutputModule()
+    output_module.SetFields([
+        'hostname', 'datetime', 'tag', 'datetime', 'message'])
+
+    with shared_test_lib.TempDirectory() as temp_directory:
+      xslx_file = os.path.join(temp_directory, 'xlsx.out')
+
+      event, event_data, event_data_stream = (
+          containers_test_lib.CreateEventFromValues(self._TEST_EVENTS[0]))
+
+      event_tag = events.EventTag()
+      event_tag.AddLabels(['Malware', 'Printed'])
+
+      output_module.Open(path=xslx_file)
+
+      try:
+        output_module.WriteHeader(output_mediator)
+
+        field_values = output_module.GetFieldValues(
+            output_mediator, event, event_data, event_data_stream, event_tag)
+
+        output_module.WriteFieldValues(output_mediator, field_values)
+
+      finally:
+        output_module.Close()
+
+      try:
+        rows = self._GetSheetRows(xslx_file)
+      except ValueError as exception:
+        self.fail(exception)
+
+      expected_header = [
+          'hostname', 'datetime', 'tag', 'datetime', 'message']
+      expected_event_body = [
+          'ubuntu', '41087.76181712963', 'Malware Printed',
+          '41087.76181712963',
+          'Reporter <CRON> PID: 8442 (pam_unix(cron:session): session '
+          'closed for user root)']
+
+      self.assertEqual(expected_header, rows[0])
+      self.assertEqual(expected_event_body, rows[1])
+
   def testWriteHeader(self):
     """Tests the WriteHeader function."""
     expected_header = [
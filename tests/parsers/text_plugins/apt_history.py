@@ -35,6 +35,88 @@ class APTHistoryLogTextPluginTest(test_lib.TextPluginTestCase):
     result = plugin.CheckRequiredFormat(parser_mediator, text_reader)
     self.assertTrue(result)
 
+  def testProcessWithUnsupportedLine(self):
+    """Tests the Process function with unsupported and indented lines."""
+    plugin = apt_history.APTHistoryLogTextPlugin()
+
+    file_system_builder = fake_file_system_builder.FakeFileSystemBuilder()
+    file_system_builder.AddFile('/file.txt', (
+        b'Start-Date: 2019-07-10  16:38:08\n'
+        b'Commandline: apt-get install joe \t\n'
+        b'Install: joe:amd64 (4.4-1) \n'
+        b'Error:\n'
+        b'End-Date: 2019-07-10  16:38:10\n'
+        b'\n'
+        b'Unsupported line\n'
+        b'  Start-Date: 2019-07-10  16:39:08\n'
+        b'Commandline: apt-get remove joe\t\n'
+        b'Remove: joe:amd64 (4.4-1)\n'
+        b'End-Date: 2019-07-10  16:39:10\n'
+        b'\tStart-Date: 2019-07-10  16:40:08\n'
+        b'Unsupported prefix Upgrade: vim:amd64 (8.0-4, 8.0-5)\n'
+        b'End-Date: 2019-07-10  16:40:10\n'
+        b'Purge: joe:amd64 (4.4-1)\n'))
+
+    file_entry = file_system_builder.file_system.GetFileEntryByPath('/file.txt')
+
+    storage_writer = self._CreateStorageWriter()
+    parser_mediator = self._CreateParserMediator(
+        storage_writer, file_entry=file_entry)
+
+    file_object = file_entry.GetFileObject()
+    plugin.Process(parser_mediator, file_object=file_object)
+
+    number_of_event_data = storage_writer.GetNumberOfAttributeContainers(
+        'event_data')
+    self.assertEqual(number_of_event_data, 3)
+
+    # Note that the unsupported line and the body line without a preceding
+    # start line each produce an extraction warning.
+    number_of_warnings = storage_writer.GetNumberOfAttributeContainers(
+        'extraction_warning')
+    self.assertEqual(number_of_warnings, 2)
+
+    number_of_warnings = storage_writer.GetNumberOfAttributeContainers(
+        'recovery_warning')
+    self.assertEqual(number_of_warnings, 0)
+
+    # Note that the body of a record line excludes trailing whitespace.
+    expected_event_values = {
+        'command': 'Install',
+        'command_line': 'apt-get install joe',
+        'data_type': 'linux:apt_history_log:entry',
+        'end_time': '2019-07-10T16:38:10',
+        'error': '',
+        'packages': 'joe:amd64 (4.4-1)',
+        'start_time': '2019-07-10T16:38:08'}
+
+    event_data = storage_writer.GetAttributeContainerByIndex('event_data', 0)
+    self.CheckEventData(event_data, expected_event_values)
+
+    expected_event_values = {
+        'command': 'Remove',
+        'command_line': 'apt-get remove joe',
+        'data_type': 'linux:apt_history_log:entry',
+        'end_time': '2019-07-10T16:39:10',
+        'error': None,
+        'packages': 'joe:amd64 (4.4-1)',
+        'start_time': '2019-07-10T16:39:08'}
+
+    event_data = storage_writer.GetAttributeContainerByIndex('event_data', 1)
+    self.CheckEventData(event_data, expected_event_values)
+
+    expected_event_values = {
+        'command': 'Upgrade',
+        'command_line': None,
+        'data_type': 'linux:apt_history_log:entry',
+        'end_time': '2019-07-10T16:40:10',
+        'error': None,
+        'packages': 'vim:amd64 (8.0-4, 8.0-5)',
+        'start_time': '2019-07-10T16:40:08'}
+
+    event_data = storage_writer.GetAttributeContainerByIndex('event_data', 2)
+    self.CheckEventData(event_data, expected_event_values)
+
   def testProcess(self):
     """Tests the Process function."""
     plugin = apt_history.APTHistoryLogTextPlugin()